@@ -0,0 +1,43 @@
+"""Shared test fixtures"""
+
+import pytest
+from unittest.mock import AsyncMock
+from webhook.src import auth, main
+from webhook.src.ha_integration import ha_client
+
+
+@pytest.fixture(autouse=True)
+def stub_ha_client(request, monkeypatch):
+    """
+    Replace Home Assistant network calls with AsyncMocks
+    
+    Tests marked as integration keep the real client, since they are
+    meant to run against an actual Home Assistant instance.
+    """
+    if request.node.get_closest_marker("integration"):
+        yield
+        return
+    
+    state = {"state": "off", "attributes": {}}
+    
+    for name in ("startup", "shutdown", "initialize_switches"):
+        monkeypatch.setattr(ha_client, name, AsyncMock(return_value=None))
+    for name in ("turn_on", "turn_off", "toggle"):
+        monkeypatch.setattr(ha_client, name, AsyncMock(return_value=None))
+    monkeypatch.setattr(ha_client, "get_state", AsyncMock(return_value=state))
+    monkeypatch.setattr(ha_client, "set_attributes", AsyncMock(return_value=state))
+    
+    # The dispatch table holds bound methods captured at import time
+    monkeypatch.setitem(main._ACTIONS, "on", ha_client.turn_on)
+    monkeypatch.setitem(main._ACTIONS, "off", ha_client.turn_off)
+    monkeypatch.setitem(main._ACTIONS, "toggle", ha_client.toggle)
+    
+    yield
+
+
+@pytest.fixture(autouse=True, scope="module")
+def clear_token_cache():
+    """Start every test module with an empty JWT verification cache"""
+    auth._decode_cached.cache_clear()
+    yield
+    auth._decode_cached.cache_clear()
@@ -2,24 +2,45 @@
 
 import pytest
 from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+from webhook.src import main
 from webhook.src.main import app
-from webhook.src.config import config
+from webhook.src.config import AppConfig, config
+from webhook.src.ha_integration import HomeAssistantClient
+from webhook.src.models import SwitchConfig
 import jwt
 from datetime import datetime, timedelta, timezone
 
+ENTITY_ID = "input_boolean.webhook_example_switch"
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def client():
-    """Test client fixture"""
+    """Test client fixture, shared by all tests in the module"""
     return TestClient(app)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def live_client():
+    """
+    Test client running the app lifespan, for integration tests
+    
+    The lifespan opens and closes the shared Home Assistant session on
+    the client's single event loop. Requires JWT_SECRET and SWITCHES.
+    """
+    if not config.validate_config():
+        pytest.skip("Integration tests need a valid JWT_SECRET and SWITCHES")
+    
+    with TestClient(app) as live:
+        yield live
+
+
+@pytest.fixture(scope="module")
 def valid_token():
-    """Generate valid JWT token for testing"""
+    """Generate valid JWT token for testing, shared by all tests in the module"""
     payload = {
         "iss": "test-client",
-        "exp": datetime.now(timezone.utc) + timedelta(hours=1)
+        "exp": datetime.now(timezone.utc) + timedelta(days=1)
     }
     return jwt.encode(payload, config.jwt_secret, algorithm="HS256")
 
@@ -123,11 +144,117 @@ def test_webhook_with_attributes(client, valid_token):
     assert response.status_code in [200, 404, 500]
 
 
+@pytest.fixture
+def ha_requests(monkeypatch):
+    """
+    Route the webhook through a real HomeAssistantClient whose
+    _make_request is mocked, with example_switch configured
+    """
+    switch = SwitchConfig(id="example_switch", name="Example")
+    monkeypatch.setattr(
+        AppConfig, "get_switch_by_id",
+        lambda self, switch_id: switch if switch_id == switch.id else None
+    )
+    
+    ha = HomeAssistantClient()
+    make_request = AsyncMock()
+    monkeypatch.setattr(ha, "_make_request", make_request)
+    monkeypatch.setattr(main, "ha_client", ha)
+    monkeypatch.setattr(main, "_ACTIONS", {
+        "on": ha.turn_on,
+        "off": ha.turn_off,
+        "toggle": ha.toggle,
+        "status": None
+    })
+    return make_request
+
+
+def _calls(make_request):
+    """(method, endpoint) pairs sent to Home Assistant, in order"""
+    return [c.args for c in make_request.await_args_list]
+
+
+def test_webhook_state_from_service_response(client, valid_token, ha_requests):
+    """Test that the new state is taken from HA's changed-states list"""
+    ha_requests.side_effect = [
+        [{"entity_id": ENTITY_ID, "state": "on", "attributes": {"a": 1}}]
+    ]
+    
+    response = client.post(
+        "/webhook",
+        headers={"Authorization": f"Bearer {valid_token}"},
+        json={"switch_id": "example_switch", "action": "on"}
+    )
+    
+    assert response.status_code == 200
+    assert _calls(ha_requests) == [("POST", "services/input_boolean/turn_on")]
+    assert response.json()["state"] == "on"
+    assert response.json()["attributes"] == {"a": 1}
+
+
+def test_webhook_attributes_reuse_service_state(client, valid_token, ha_requests):
+    """Test that set_attributes builds on the service state without a GET"""
+    ha_requests.side_effect = [
+        [{"entity_id": ENTITY_ID, "state": "on", "attributes": {"a": 1}}],
+        {"entity_id": ENTITY_ID, "state": "on", "attributes": {"a": 1, "b": 2}}
+    ]
+    
+    response = client.post(
+        "/webhook",
+        headers={"Authorization": f"Bearer {valid_token}"},
+        json={"switch_id": "example_switch", "action": "on", "attributes": {"b": 2}}
+    )
+    
+    assert response.status_code == 200
+    assert _calls(ha_requests) == [
+        ("POST", "services/input_boolean/turn_on"),
+        ("POST", f"states/{ENTITY_ID}")
+    ]
+    posted = ha_requests.await_args_list[1].kwargs["json_data"]
+    assert posted["state"] == "on"
+    assert posted["attributes"]["a"] == 1 and posted["attributes"]["b"] == 2
+    assert response.json()["state"] == "on"
+    assert response.json()["attributes"] == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("service_response", [
+    [],
+    [{"entity_id": "input_boolean.other", "state": "on"}, "not-a-state"],
+    {"message": "unexpected shape"},
+    None
+])
+def test_webhook_unchanged_state_falls_back_to_get(
+    client, valid_token, ha_requests, service_response
+):
+    """
+    Test that get_state is used when the entity is not in the changed
+    list or the service response is not a list of states
+    """
+    ha_requests.side_effect = [
+        service_response,
+        {"entity_id": ENTITY_ID, "state": "on", "attributes": {"a": 1}}
+    ]
+    
+    response = client.post(
+        "/webhook",
+        headers={"Authorization": f"Bearer {valid_token}"},
+        json={"switch_id": "example_switch", "action": "on"}
+    )
+    
+    assert response.status_code == 200
+    assert _calls(ha_requests) == [
+        ("POST", "services/input_boolean/turn_on"),
+        ("GET", f"states/{ENTITY_ID}")
+    ]
+    assert response.json()["state"] == "on"
+    assert response.json()["attributes"] == {"a": 1}
+
+
 # Integration tests - require actual HA instance
 @pytest.mark.integration
-def test_switch_on_integration(client, valid_token):
+def test_switch_on_integration(live_client, valid_token):
     """Integration test for turning switch on"""
-    response = client.post(
+    response = live_client.post(
         "/webhook",
         headers={"Authorization": f"Bearer {valid_token}"},
         json={
@@ -136,18 +263,18 @@ def test_switch_on_integration(client, valid_token):
         }
     )
     
-    if response.status_code == 200:
-        data = response.json()
-        assert data["status"] == "success"
-        assert data["switch_id"] == "example_switch"
-        assert data["action"] == "on"
-        assert data["state"] in ["on", "off"]
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["switch_id"] == "example_switch"
+    assert data["action"] == "on"
+    assert data["state"] in ["on", "off"]
 
 
 @pytest.mark.integration
-def test_switch_toggle_integration(client, valid_token):
+def test_switch_toggle_integration(live_client, valid_token):
     """Integration test for toggling switch"""
-    response = client.post(
+    response = live_client.post(
         "/webhook",
         headers={"Authorization": f"Bearer {valid_token}"},
         json={
@@ -156,16 +283,16 @@ def test_switch_toggle_integration(client, valid_token):
         }
     )
     
-    if response.status_code == 200:
-        data = response.json()
-        assert data["status"] == "success"
-        assert data["action"] == "toggle"
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["action"] == "toggle"
 
 
 @pytest.mark.integration
-def test_switch_status_integration(client, valid_token):
+def test_switch_status_integration(live_client, valid_token):
     """Integration test for getting switch status"""
-    response = client.post(
+    response = live_client.post(
         "/webhook",
         headers={"Authorization": f"Bearer {valid_token}"},
         json={
@@ -174,9 +301,9 @@ def test_switch_status_integration(client, valid_token):
         }
     )
     
-    if response.status_code == 200:
-        data = response.json()
-        assert data["status"] == "success"
-        assert data["action"] == "status"
-        assert "state" in data
-        assert "attributes" in data
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["action"] == "status"
+    assert "state" in data
+    assert "attributes" in data
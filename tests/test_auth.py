@@ -101,3 +101,129 @@ def test_token_without_expiration():
     # Should succeed - expiration is optional
     result = verify_jwt_token(token)
     assert result["iss"] == "test-service"
+
+
+def test_cached_token_expires(monkeypatch):
+    """Test that a cached token is rejected once it expires"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    payload = {
+        "iss": "test-service",
+        "exp": expires_at
+    }
+    
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    # First verification populates the cache
+    assert verify_jwt_token(token)["iss"] == "test-service"
+    
+    # Move the clock past expiration - cached result must not be trusted
+    import webhook.src.auth as auth_module
+    monkeypatch.setattr(
+        auth_module, "_now", lambda: expires_at.timestamp() + 1
+    )
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    
+    assert exc_info.value.status_code == 401
+    assert "expired" in exc_info.value.detail.lower()
+
+
+def test_unsigned_token_rejected():
+    """Test that tokens using the 'none' algorithm are rejected"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    token = jwt.encode({"iss": "test-service"}, None, algorithm="none")
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    
+    assert exc_info.value.status_code == 401
+
+
+def test_tampered_payload_rejected():
+    """Test that modifying the payload invalidates the signature"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    token = jwt.encode({"iss": "test-service"}, secret, algorithm="HS256")
+    forged = jwt.encode({"iss": "attacker"}, secret, algorithm="HS256")
+    
+    # Keep the original signature but swap in the forged payload
+    header, _, signature = token.split(".")
+    tampered = ".".join([header, forged.split(".")[1], signature])
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(tampered)
+    
+    assert exc_info.value.status_code == 401
+
+
+def test_token_not_yet_valid():
+    """Test JWT token with nbf claim in the future"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    payload = {
+        "iss": "test-service",
+        "nbf": datetime.now(timezone.utc) + timedelta(hours=1)
+    }
+    
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    
+    assert exc_info.value.status_code == 401
+
+
+def test_token_issued_in_future():
+    """Test JWT token with iat claim in the future"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    payload = {
+        "iss": "test-service",
+        "iat": datetime.now(timezone.utc) + timedelta(hours=1)
+    }
+    
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    
+    assert exc_info.value.status_code == 401
+
+
+def test_token_with_audience():
+    """Test JWT token with an aud claim (no audience is configured)"""
+    secret = "test-secret-key-at-least-32-chars-long"
+    
+    payload = {
+        "iss": "test-service",
+        "aud": "some-service"
+    }
+    
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    
+    import webhook.src.config as config_module
+    config_module.config.jwt_secret = secret
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_jwt_token(token)
+    
+    assert exc_info.value.status_code == 401
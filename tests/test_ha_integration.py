@@ -0,0 +1,98 @@
+"""Tests for Home Assistant integration"""
+
+import logging
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from webhook.src import ha_integration
+from webhook.src.ha_integration import HomeAssistantClient
+from webhook.src.models import SwitchConfig
+
+
+async def test_initialize_switches_mixed(monkeypatch, caplog):
+    """Test startup checks with found, missing and failing switches"""
+    switches = [
+        SwitchConfig(id="found", name="Found"),
+        SwitchConfig(id="missing", name="Missing"),
+        SwitchConfig(id="broken", name="Broken")
+    ]
+    
+    async def exists(entity_id):
+        if entity_id == "input_boolean.webhook_broken":
+            raise ConnectionError("Home Assistant unreachable")
+        return entity_id == "input_boolean.webhook_found"
+    
+    ha = HomeAssistantClient()
+    entity_exists = AsyncMock(side_effect=exists)
+    monkeypatch.setattr(ha, "_entity_exists", entity_exists)
+    monkeypatch.setattr(ha_integration, "config", SimpleNamespace(switches=switches))
+    
+    # Errors are reported as missing helpers instead of propagating
+    with caplog.at_level(logging.WARNING, logger=ha_integration.__name__):
+        await ha.initialize_switches()
+    
+    checked = sorted(c.args[0] for c in entity_exists.await_args_list)
+    assert checked == [
+        "input_boolean.webhook_broken",
+        "input_boolean.webhook_found",
+        "input_boolean.webhook_missing"
+    ]
+    missing_reports = [
+        r.getMessage() for r in caplog.records if "NOT FOUND" in r.getMessage()
+    ]
+    assert len(missing_reports) == 2
+    assert any("input_boolean.webhook_broken" in m for m in missing_reports)
+    assert any("input_boolean.webhook_missing" in m for m in missing_reports)
+    
+    # Entities already confirmed are not probed again
+    entity_exists.reset_mock()
+    await ha.initialize_switches()
+    
+    rechecked = sorted(c.args[0] for c in entity_exists.await_args_list)
+    assert rechecked == [
+        "input_boolean.webhook_broken",
+        "input_boolean.webhook_missing"
+    ]
+
+
+async def test_entity_exists_uses_status_code(monkeypatch):
+    """Test that existence is decided from the status code alone"""
+    statuses = {
+        "api/states/input_boolean.webhook_found": 200,
+        "api/states/input_boolean.webhook_missing": 404
+    }
+    
+    class FakeSession:
+        closed = False
+        
+        @asynccontextmanager
+        async def get(self, url):
+            # No json/read on the response - the body is never parsed
+            yield SimpleNamespace(status=statuses[url])
+    
+    ha = HomeAssistantClient()
+    monkeypatch.setattr(ha, "_session", FakeSession())
+    
+    assert await ha._entity_exists("input_boolean.webhook_found") is True
+    assert await ha._entity_exists("input_boolean.webhook_missing") is False
+
+
+
+async def test_requests_require_startup():
+    """Test that requests fail clearly until startup() opens the session"""
+    ha = HomeAssistantClient()
+    
+    with pytest.raises(RuntimeError, match="startup"):
+        await ha._make_request("GET", "states/input_boolean.webhook_found")
+    
+    await ha.startup()
+    session = ha._session
+    assert session is not None and not session.closed
+    
+    await ha.shutdown()
+    assert session.closed
+    
+    # No session is silently recreated after shutdown either
+    with pytest.raises(RuntimeError, match="startup"):
+        await ha._entity_exists("input_boolean.webhook_found")
@@ -25,4 +25,4 @@ echo "  Switches configured: $(echo $SWITCHES | jq length)"
 
 # Start the FastAPI application
 cd /app
-exec python -m uvicorn src.main:app --host 0.0.0.0 --port $PORT --log-level $(echo $LOG_LEVEL | tr '[:upper:]' '[:lower:]')
+exec python -m uvicorn src.main:app --host 0.0.0.0 --port $PORT --loop uvloop --log-level $(echo $LOG_LEVEL | tr '[:upper:]' '[:lower:]')
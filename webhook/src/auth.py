@@ -1,8 +1,13 @@
 """JWT authentication module"""
 
-import jwt
+import base64
+import hashlib
+import hmac
 import logging
-from datetime import datetime, timezone
+import math
+import time
+from functools import lru_cache
+import orjson
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .config import config
@@ -10,6 +15,114 @@ from .config import config
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
+# Clock used for token time claims (patched in tests)
+_now = time.time
+
+
+class InvalidTokenError(Exception):
+    """Raised when a JWT token is malformed or its signature is invalid"""
+
+
+class ExpiredTokenError(InvalidTokenError):
+    """Raised when a JWT token has expired"""
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """Decode a base64url segment, restoring the stripped padding"""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _is_number(value) -> bool:
+    """Check that a claim is numeric (bool is not accepted)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def verify_hs256(token: str, secret: bytes, verify_exp: bool = True) -> dict:
+    """
+    Verify an HS256-signed JWT token and return its payload
+    
+    Signature check is a single HMAC-SHA256 (OpenSSL-backed) plus a
+    constant-time comparison; header and payload are parsed with orjson.
+    
+    Args:
+        token: JWT token string
+        secret: Secret used to verify the signature
+        verify_exp: Whether to reject tokens whose exp claim has passed
+        
+    Returns:
+        Decoded token payload
+        
+    Raises:
+        ExpiredTokenError: If verify_exp is set and the exp claim has passed
+        InvalidTokenError: If the token is malformed, uses another
+            algorithm, has a bad signature, is not yet valid (nbf/iat)
+            or carries an audience claim
+    """
+    try:
+        signing_input, _, signature_segment = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        if not header_segment or not payload_segment or "." in payload_segment:
+            raise InvalidTokenError("Not enough segments")
+        
+        header = orjson.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            raise InvalidTokenError("The specified alg value is not allowed")
+        
+        signature = _b64url_decode(signature_segment)
+        expected = hmac.new(
+            secret, signing_input.encode("ascii"), hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidTokenError("Signature verification failed")
+        
+        payload = orjson.loads(_b64url_decode(payload_segment))
+    except ValueError as e:
+        # binascii, unicode and orjson decode errors are all ValueErrors
+        raise InvalidTokenError(f"Invalid token encoding: {e}") from e
+    
+    if not isinstance(payload, dict):
+        raise InvalidTokenError("Invalid payload")
+    
+    now = _now()
+    for claim in ("exp", "nbf", "iat"):
+        if claim in payload and not _is_number(payload[claim]):
+            raise InvalidTokenError(f"{claim} claim must be a number")
+    
+    if "nbf" in payload and payload["nbf"] > now:
+        raise InvalidTokenError("The token is not yet valid (nbf)")
+    
+    if "iat" in payload and int(payload["iat"]) > now:
+        raise InvalidTokenError("The token is not yet valid (iat)")
+    
+    # No audience is configured, so any non-empty aud claim is rejected
+    if payload.get("aud"):
+        raise InvalidTokenError("Invalid audience")
+    
+    if verify_exp and "exp" in payload and payload["exp"] <= now:
+        raise ExpiredTokenError("Signature has expired")
+    
+    return payload
+
+
+@lru_cache(maxsize=1024)
+def _decode_cached(token: str, secret: str) -> tuple[dict, float]:
+    """
+    Decode and verify a JWT token, caching successful results
+    
+    Only valid tokens are cached (exceptions are never memoized), so
+    repeated requests with the same token skip signature verification.
+    Expiration is not checked here - the caller checks it on every use.
+    
+    Args:
+        token: JWT token string
+        secret: Secret used to verify the signature
+        
+    Returns:
+        Tuple of decoded payload and expiration timestamp (inf if absent)
+    """
+    payload = verify_hs256(token, secret.encode(), verify_exp=False)
+    return payload, float(payload.get("exp", math.inf))
+
 
 def verify_jwt_token(token: str) -> dict:
     """
@@ -25,39 +138,33 @@ def verify_jwt_token(token: str) -> dict:
         HTTPException: If token is invalid or expired
     """
     try:
-        payload = jwt.decode(
-            token,
-            config.jwt_secret,
-            algorithms=["HS256"]
-        )
+        cached_payload, exp_timestamp = _decode_cached(token, config.jwt_secret)
+        payload = dict(cached_payload)
         
-        # Check expiration if present
-        if "exp" in payload:
-            exp_timestamp = payload["exp"]
-            if datetime.now(timezone.utc).timestamp() > exp_timestamp:
-                logger.warning("JWT token expired")
-                raise HTTPException(
-                    status_code=401,
-                    detail="Token expired"
-                )
+        # Single expiration check, valid for fresh and cached tokens alike
+        if exp_timestamp <= _now():
+            logger.warning("JWT token expired")
+            raise HTTPException(
+                status_code=401,
+                detail="Token expired"
+            )
         
-        logger.debug(f"JWT token verified successfully for issuer: {payload.get('iss', 'unknown')}")
+        logger.debug(
+            "JWT token verified successfully for issuer: %s",
+            payload.get("iss", "unknown")
+        )
         return payload
         
-    except jwt.ExpiredSignatureError:
-        logger.warning("JWT token expired")
-        raise HTTPException(
-            status_code=401,
-            detail="Token expired"
-        )
-    except jwt.InvalidTokenError as e:
-        logger.warning(f"Invalid JWT token: {e}")
+    except HTTPException:
+        raise
+    except InvalidTokenError as e:
+        logger.warning("Invalid JWT token: %s", e)
         raise HTTPException(
             status_code=401,
             detail="Invalid authentication token"
         )
     except Exception as e:
-        logger.error(f"Unexpected error during JWT verification: {e}")
+        logger.error("Unexpected error during JWT verification: %s", e)
         raise HTTPException(
             status_code=401,
             detail="Authentication failed"
@@ -1,41 +1,57 @@
 """Configuration management"""
 
 import os
-import json
 import logging
-from typing import List
+from functools import cached_property
+from typing import Dict, List
+from pydantic import TypeAdapter, field_validator
 from pydantic_settings import BaseSettings
 from .models import SwitchConfig
 
 logger = logging.getLogger(__name__)
 
+# Validates the raw SWITCHES JSON in pydantic-core, without a dict round-trip
+_SWITCHES_ADAPTER = TypeAdapter(List[SwitchConfig])
+
 
 class AppConfig(BaseSettings):
-    """Application configuration loaded from environment variables"""
+    """
+    Application configuration loaded from environment variables
+    
+    Fields are bound to the matching (case-insensitive) environment
+    variables by pydantic-settings and validated once at instantiation.
+    """
     
-    jwt_secret: str = os.getenv("JWT_SECRET", "")
-    port: int = int(os.getenv("PORT", "8099"))
-    log_level: str = os.getenv("LOG_LEVEL", "info").upper()
-    supervisor_token: str = os.getenv("SUPERVISOR_TOKEN", "")
-    ha_url: str = os.getenv("HA_URL", "http://supervisor/core")
+    jwt_secret: str = ""
+    port: int = 8099
+    log_level: str = "INFO"
+    supervisor_token: str = ""
+    ha_url: str = "http://supervisor/core"
     
-    @property
+    @field_validator("log_level")
+    @classmethod
+    def _normalize_log_level(cls, value: str) -> str:
+        """Store log level upper-cased, as expected by the logging module"""
+        return value.upper()
+    
+    @cached_property
     def switches(self) -> List[SwitchConfig]:
-        """Parse switches configuration from JSON environment variable"""
+        """Parse switches configuration from JSON environment variable (once)"""
         switches_json = os.getenv("SWITCHES", "[]")
         try:
-            switches_data = json.loads(switches_json)
-            return [SwitchConfig(**switch) for switch in switches_data]
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse switches configuration: {e}")
+            return _SWITCHES_ADAPTER.validate_json(switches_json)
+        except ValueError as e:
+            logger.error("Failed to parse switches configuration: %s", e)
             return []
     
+    @cached_property
+    def _switch_index(self) -> Dict[str, SwitchConfig]:
+        """Switches keyed by ID for constant-time lookup"""
+        return {switch.id: switch for switch in self.switches}
+    
     def get_switch_by_id(self, switch_id: str) -> SwitchConfig | None:
         """Get switch configuration by ID"""
-        for switch in self.switches:
-            if switch.id == switch_id:
-                return switch
-        return None
+        return self._switch_index.get(switch_id)
     
     def validate_config(self) -> bool:
         """Validate configuration"""
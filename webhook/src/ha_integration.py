@@ -1,14 +1,59 @@
 """Home Assistant integration module"""
 
+import asyncio
 import logging
+import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 import aiohttp
+import orjson
 from .config import config
-from .models import SwitchConfig
+from .models import ENTITY_ID_PREFIX, SwitchConfig
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent existence checks during startup
+MAX_CONCURRENT_CHECKS = 16
+
+# Setup instructions logged when a switch's Input Boolean helper is missing
+_MISSING_HELPER_MESSAGE = (
+    "\n"
+    "%(rule)s\n"
+    "⚠️  Input Boolean '%(entity_id)s' NOT FOUND!\n"
+    "%(rule)s\n"
+    "\n"
+    "Please create it manually in Home Assistant:\n"
+    "\n"
+    "Option 1: Via UI (Recommended)\n"
+    "  1. Go to Settings → Devices & Services → Helpers\n"
+    "  2. Click '+ CREATE HELPER' → Toggle\n"
+    "  3. Name: %(name)s\n"
+    "  4. Icon: %(icon)s\n"
+    "  5. IMPORTANT: Object ID must be: webhook_%(id)s\n"
+    "     (This creates entity: %(entity_id)s)\n"
+    "  6. Click CREATE\n"
+    "  7. Restart this addon\n"
+    "\n"
+    "Option 2: Via configuration.yaml\n"
+    "  Add to your configuration.yaml:\n"
+    "  \n"
+    "  input_boolean:\n"
+    "    webhook_%(id)s:\n"
+    "      name: %(name)s\n"
+    "      icon: %(icon)s\n"
+    "  \n"
+    "  Then restart Home Assistant.\n"
+    "\n"
+    "%(rule)s\n"
+)
+
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(seconds: int) -> str:
+    """Format a Unix timestamp (whole seconds) as local ISO 8601 time"""
+    return datetime.fromtimestamp(seconds).isoformat()
+
 
 class HomeAssistantClient:
     """Client for interacting with Home Assistant REST API"""
@@ -16,14 +61,92 @@ class HomeAssistantClient:
     def __init__(self):
         self.base_url = config.ha_url
         self.token = config.supervisor_token
+        # Sent as session defaults; aiohttp adds Content-Type for JSON bodies
         self.headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {self.token}"
         }
+        self._session: aiohttp.ClientSession | None = None
+        # Entity IDs already confirmed to exist in Home Assistant
+        self._known_entities: set[str] = set()
+    
+    async def startup(self) -> None:
+        """Open the shared HTTP session used for all Home Assistant calls"""
+        if self._session is not None and not self._session.closed:
+            return
+        
+        # aiohttp only joins relative paths onto a base URL ending with '/'
+        self._session = aiohttp.ClientSession(
+            base_url=f"{self.base_url.rstrip('/')}/",
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=75)
+        )
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared session opened by startup()
+        
+        The session is bound to the event loop that opened it, so it is
+        only ever created by the application lifespan, never lazily.
+        """
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HomeAssistantClient.startup() was not called")
+        return self._session
+    
+    async def shutdown(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
     
     def _get_entity_id(self, switch_id: str) -> str:
         """Get Home Assistant entity ID for a switch"""
-        return f"input_boolean.webhook_{switch_id}"
+        switch = config.get_switch_by_id(switch_id)
+        if switch is not None:
+            return switch.entity_id
+        return ENTITY_ID_PREFIX + switch_id
+    
+    @staticmethod
+    def _extract_state(response: dict) -> dict:
+        """Reduce a Home Assistant state object to 'state' and 'attributes'"""
+        return {
+            "state": response.get("state", "unknown"),
+            "attributes": response.get("attributes", {})
+        }
+    
+    async def _call_service(self, service: str, switch_id: str) -> Optional[dict]:
+        """
+        Call an input_boolean service for a switch
+        
+        Home Assistant answers with the list of states that changed while
+        the service ran, so the new state can be taken from the response
+        instead of fetching it again.
+        
+        Args:
+            service: Service name (turn_on, turn_off, toggle)
+            switch_id: Switch ID
+            
+        Returns:
+            New state dictionary, or None if the entity state did not change
+            or the response is not a list of states
+        """
+        entity_id = self._get_entity_id(switch_id)
+        
+        changed_states = await self._make_request(
+            "POST",
+            f"services/input_boolean/{service}",
+            json_data={"entity_id": entity_id}
+        )
+        
+        # Anything but the documented list of state objects falls back
+        # to a regular state lookup by the caller
+        if not isinstance(changed_states, list):
+            return None
+        
+        for changed in changed_states:
+            if isinstance(changed, dict) and changed.get("entity_id") == entity_id:
+                return self._extract_state(changed)
+        return None
     
     async def _make_request(
         self,
@@ -32,26 +155,30 @@ class HomeAssistantClient:
         json_data: Optional[dict] = None
     ) -> dict:
         """Make HTTP request to Home Assistant API"""
-        url = f"{self.base_url}/api/{endpoint}"
+        session = self._get_session()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method,
-                    url,
-                    headers=self.headers,
-                    json=json_data,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            async with session.request(
+                method,
+                f"api/{endpoint}",
+                json=json_data
+            ) as response:
+                response.raise_for_status()
+                return await response.json(loads=orjson.loads)
         except aiohttp.ClientError as e:
-            logger.error(f"Home Assistant API error: {e}")
+            logger.error("Home Assistant API error: %s", e)
             raise Exception(f"Failed to communicate with Home Assistant: {e}")
         except Exception as e:
-            logger.error(f"Unexpected error calling Home Assistant: {e}")
+            logger.error("Unexpected error calling Home Assistant: %s", e)
             raise
     
+    async def _entity_exists(self, entity_id: str) -> bool:
+        """Check entity existence by status code, without parsing the body"""
+        session = self._get_session()
+        
+        async with session.get(f"api/states/{entity_id}") as response:
+            return response.status == 200
+    
     async def ensure_switch_exists(self, switch: SwitchConfig) -> bool:
         """
         Check if input_boolean helper exists for the switch
@@ -66,46 +193,33 @@ class HomeAssistantClient:
         Returns:
             True if switch exists, False otherwise
         """
-        entity_id = self._get_entity_id(switch.id)
+        entity_id = switch.entity_id
+        if entity_id in self._known_entities:
+            return True
         
         try:
-            # Check if entity exists
-            await self._make_request("GET", f"states/{entity_id}")
-            logger.info(f"✅ Switch {entity_id} found")
+            exists = await self._entity_exists(entity_id)
+        except Exception as e:
+            logger.debug("Existence check for %s failed: %s", entity_id, e)
+            exists = False
+        
+        if exists:
+            self._known_entities.add(entity_id)
+            logger.info("✅ Switch %s found", entity_id)
             return True
-        except Exception:
-            # Entity doesn't exist - show helpful message
-            logger.warning(
-                f"\n"
-                f"{'='*60}\n"
-                f"⚠️  Input Boolean '{entity_id}' NOT FOUND!\n"
-                f"{'='*60}\n"
-                f"\n"
-                f"Please create it manually in Home Assistant:\n"
-                f"\n"
-                f"Option 1: Via UI (Recommended)\n"
-                f"  1. Go to Settings → Devices & Services → Helpers\n"
-                f"  2. Click '+ CREATE HELPER' → Toggle\n"
-                f"  3. Name: {switch.name}\n"
-                f"  4. Icon: {switch.icon}\n"
-                f"  5. IMPORTANT: Object ID must be: webhook_{switch.id}\n"
-                f"     (This creates entity: {entity_id})\n"
-                f"  6. Click CREATE\n"
-                f"  7. Restart this addon\n"
-                f"\n"
-                f"Option 2: Via configuration.yaml\n"
-                f"  Add to your configuration.yaml:\n"
-                f"  \n"
-                f"  input_boolean:\n"
-                f"    webhook_{switch.id}:\n"
-                f"      name: {switch.name}\n"
-                f"      icon: {switch.icon}\n"
-                f"  \n"
-                f"  Then restart Home Assistant.\n"
-                f"\n"
-                f"{'='*60}\n"
-            )
-            return False
+        
+        # Entity doesn't exist - show helpful message
+        logger.warning(
+            _MISSING_HELPER_MESSAGE,
+            {
+                "rule": "=" * 60,
+                "entity_id": entity_id,
+                "name": switch.name,
+                "icon": switch.icon,
+                "id": switch.id
+            }
+        )
+        return False
     
     async def get_state(self, switch_id: str) -> dict:
         """
@@ -121,68 +235,61 @@ class HomeAssistantClient:
         
         try:
             response = await self._make_request("GET", f"states/{entity_id}")
-            return {
-                "state": response.get("state", "unknown"),
-                "attributes": response.get("attributes", {})
-            }
+            return self._extract_state(response)
         except Exception as e:
-            logger.error(f"Failed to get state for {switch_id}: {e}")
+            logger.error("Failed to get state for %s: %s", switch_id, e)
             raise
     
-    async def turn_on(self, switch_id: str) -> None:
-        """Turn on a switch"""
-        entity_id = self._get_entity_id(switch_id)
-        
-        await self._make_request(
-            "POST",
-            f"services/input_boolean/turn_on",
-            json_data={"entity_id": entity_id}
-        )
-        logger.info(f"Switch {switch_id} turned on")
+    async def turn_on(self, switch_id: str) -> Optional[dict]:
+        """Turn on a switch and return its new state if it changed"""
+        new_state = await self._call_service("turn_on", switch_id)
+        logger.info("Switch %s turned on", switch_id)
+        return new_state
     
-    async def turn_off(self, switch_id: str) -> None:
-        """Turn off a switch"""
-        entity_id = self._get_entity_id(switch_id)
-        
-        await self._make_request(
-            "POST",
-            f"services/input_boolean/turn_off",
-            json_data={"entity_id": entity_id}
-        )
-        logger.info(f"Switch {switch_id} turned off")
+    async def turn_off(self, switch_id: str) -> Optional[dict]:
+        """Turn off a switch and return its new state if it changed"""
+        new_state = await self._call_service("turn_off", switch_id)
+        logger.info("Switch %s turned off", switch_id)
+        return new_state
     
-    async def toggle(self, switch_id: str) -> None:
-        """Toggle a switch"""
-        entity_id = self._get_entity_id(switch_id)
-        
-        await self._make_request(
-            "POST",
-            f"services/input_boolean/toggle",
-            json_data={"entity_id": entity_id}
-        )
-        logger.info(f"Switch {switch_id} toggled")
+    async def toggle(self, switch_id: str) -> Optional[dict]:
+        """Toggle a switch and return its new state if it changed"""
+        new_state = await self._call_service("toggle", switch_id)
+        logger.info("Switch %s toggled", switch_id)
+        return new_state
     
     async def set_attributes(
         self,
         switch_id: str,
-        attributes: dict
-    ) -> None:
+        attributes: dict,
+        current_state: Optional[dict] = None
+    ) -> dict:
         """
         Set custom attributes on a switch
         
         Note: This uses state update to set attributes
+        
+        Args:
+            switch_id: Switch ID
+            attributes: Attributes to merge into the existing ones
+            current_state: Already known state of the switch, fetched if omitted
+            
+        Returns:
+            State dictionary after the update
         """
         entity_id = self._get_entity_id(switch_id)
-        current_state = await self.get_state(switch_id)
+        if current_state is None:
+            current_state = await self.get_state(switch_id)
         
         # Merge new attributes with existing ones
         updated_attributes = current_state.get("attributes", {}).copy()
         updated_attributes.update(attributes)
-        updated_attributes["last_triggered_at"] = datetime.now().isoformat()
+        # Formatted at most once per second under sustained load
+        updated_attributes["last_triggered_at"] = _iso_timestamp(int(time.time()))
         
         # Update state with new attributes
         try:
-            await self._make_request(
+            response = await self._make_request(
                 "POST",
                 f"states/{entity_id}",
                 json_data={
@@ -190,19 +297,27 @@ class HomeAssistantClient:
                     "attributes": updated_attributes
                 }
             )
-            logger.debug(f"Updated attributes for {switch_id}")
+            logger.debug("Updated attributes for %s", switch_id)
+            return self._extract_state(response)
         except Exception as e:
-            logger.warning(f"Failed to set attributes for {switch_id}: {e}")
+            logger.warning("Failed to set attributes for %s: %s", switch_id, e)
+            return current_state
     
     async def initialize_switches(self) -> None:
         """Initialize all configured switches"""
-        logger.info(f"Initializing {len(config.switches)} switches...")
+        logger.info("Initializing %s switches...", len(config.switches))
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+        
+        async def check(switch: SwitchConfig) -> None:
+            async with semaphore:
+                try:
+                    await self.ensure_switch_exists(switch)
+                except Exception as e:
+                    logger.error("Failed to initialize switch %s: %s", switch.id, e)
         
-        for switch in config.switches:
-            try:
-                await self.ensure_switch_exists(switch)
-            except Exception as e:
-                logger.error(f"Failed to initialize switch {switch.id}: {e}")
+        # Check all switches concurrently instead of one round-trip at a time
+        await asyncio.gather(*(check(switch) for switch in config.switches))
         
         logger.info("Switch initialization complete")
 
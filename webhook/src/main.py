@@ -3,7 +3,7 @@
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from .models import WebhookRequest, WebhookResponse, ErrorResponse
 from .config import config
 from .auth import verify_authentication
@@ -17,6 +17,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Webhook action -> Home Assistant client call (None for read-only actions)
+_ACTIONS = {
+    "on": ha_client.turn_on,
+    "off": ha_client.turn_off,
+    "toggle": ha_client.toggle,
+    "status": None
+}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,14 +39,17 @@ async def lifespan(app: FastAPI):
         logger.error("Configuration validation failed!")
         raise RuntimeError("Invalid configuration")
     
-    logger.info(f"Configuration validated successfully")
-    logger.info(f"Configured switches: {len(config.switches)}")
+    logger.info("Configuration validated successfully")
+    logger.info("Configured switches: %s", len(config.switches))
+    
+    # Open the shared Home Assistant session
+    await ha_client.startup()
     
     # Initialize Home Assistant switches
     try:
         await ha_client.initialize_switches()
     except Exception as e:
-        logger.error(f"Failed to initialize switches: {e}")
+        logger.error("Failed to initialize switches: %s", e)
         # Don't raise - allow addon to start even if HA is temporarily unavailable
     
     logger.info("Webhook addon is ready to receive requests")
@@ -47,6 +58,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Incoming Webhook Addon")
+    await ha_client.shutdown()
 
 
 # Create FastAPI app
@@ -54,7 +66,8 @@ app = FastAPI(
     title="Home Assistant Incoming Webhook",
     description="Secure webhook API for controlling virtual switches",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -94,34 +107,34 @@ async def webhook(
     action = request.action
     custom_attributes = request.attributes or {}
     
-    logger.info(f"Webhook called: switch_id={switch_id}, action={action}")
+    logger.info("Webhook called: switch_id=%s, action=%s", switch_id, action)
     
     # Validate switch exists in configuration
     switch_config = config.get_switch_by_id(switch_id)
     if not switch_config:
-        logger.warning(f"Switch '{switch_id}' not found in configuration")
+        logger.warning("Switch '%s' not found in configuration", switch_id)
         raise HTTPException(
             status_code=404,
             detail=f"Switch '{switch_id}' is not configured"
         )
     
     try:
-        # Perform the requested action
-        if action == "on":
-            await ha_client.turn_on(switch_id)
-            
-        elif action == "off":
-            await ha_client.turn_off(switch_id)
-            
-        elif action == "toggle":
-            await ha_client.toggle(switch_id)
+        # Perform the requested action; service calls report the new
+        # state when it changed, so no extra round-trip is needed
+        state_info = None
+        handler = _ACTIONS[action]
+        if handler is not None:
+            state_info = await handler(switch_id)
         
         # Set custom attributes (for all actions including status)
         if custom_attributes:
-            await ha_client.set_attributes(switch_id, custom_attributes)
+            state_info = await ha_client.set_attributes(
+                switch_id, custom_attributes, current_state=state_info
+            )
         
-        # Get current state
-        state_info = await ha_client.get_state(switch_id)
+        # Fetch current state only if nothing above already returned it
+        if state_info is None:
+            state_info = await ha_client.get_state(switch_id)
         
         # Build response
         response = WebhookResponse(
@@ -133,8 +146,8 @@ async def webhook(
         )
         
         logger.info(
-            f"Successfully processed {action} for {switch_id}, "
-            f"state={state_info['state']}"
+            "Successfully processed %s for %s, state=%s",
+            action, switch_id, state_info["state"]
         )
         
         return response
@@ -142,7 +155,7 @@ async def webhook(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing webhook request: {e}")
+        logger.error("Error processing webhook request: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error"
@@ -157,7 +170,7 @@ async def http_exception_handler(request, exc: HTTPException):
         details=str(exc.detail) if not isinstance(exc.detail, str) else None
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=error_response.model_dump()
     )
@@ -166,14 +179,14 @@ async def http_exception_handler(request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc: Exception):
     """General exception handler for unexpected errors"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     
     error_response = ErrorResponse(
         error="Internal server error",
         details="An unexpected error occurred"
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=error_response.model_dump()
     )
@@ -185,5 +198,6 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=config.port,
-        log_level=config.log_level.lower()
+        log_level=config.log_level.lower(),
+        loop="uvloop"
     )
@@ -1,20 +1,36 @@
 """Pydantic models for request/response validation"""
 
+from functools import cached_property
 from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Home Assistant entity ID prefix for the Input Boolean backing a switch
+ENTITY_ID_PREFIX = "input_boolean.webhook_"
+
+# Actions accepted by the webhook endpoint
+WebhookAction = Literal["on", "off", "toggle", "status"]
 
 
 class SwitchConfig(BaseModel):
     """Configuration for a single virtual switch"""
+    model_config = ConfigDict(frozen=True)
+    
     id: str = Field(..., description="Unique identifier for the switch")
     name: str = Field(..., description="Friendly name displayed in Home Assistant")
     icon: str = Field(default="mdi:light-switch", description="Material Design Icon")
+    
+    @cached_property
+    def entity_id(self) -> str:
+        """Home Assistant entity ID for this switch"""
+        return ENTITY_ID_PREFIX + self.id
 
 
 class WebhookRequest(BaseModel):
     """Incoming webhook request model"""
+    model_config = ConfigDict(frozen=True)
+    
     switch_id: str = Field(..., description="ID of the switch to control")
-    action: Literal["on", "off", "toggle", "status"] = Field(
+    action: WebhookAction = Field(
         ..., 
         description="Action to perform: on, off, toggle, or status"
     )
@@ -26,6 +42,8 @@ class WebhookRequest(BaseModel):
 
 class WebhookResponse(BaseModel):
     """Webhook response model"""
+    model_config = ConfigDict(frozen=True)
+    
     status: Literal["success", "error"]
     switch_id: Optional[str] = None
     action: Optional[str] = None
@@ -37,6 +55,8 @@ class WebhookResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model"""
+    model_config = ConfigDict(frozen=True)
+    
     status: Literal["error"] = "error"
     error: str
     details: Optional[str] = None